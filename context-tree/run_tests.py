@@ -1,24 +1,29 @@
 #!/usr/bin/env python3
 """Simple test runner that handles imports correctly."""
 
+import os
 import sys
 import subprocess
 from pathlib import Path
 
+PROJECT_ROOT = Path(__file__).resolve().parent
+
 def main():
     # Add src to Python path
-    src_path = Path(__file__).parent / "src"
-    env = {"PYTHONPATH": str(src_path)}
-    
-    # Run pytest with proper environment
-    result = subprocess.run([
-        sys.executable, "-m", "pytest", 
-        "tests/", 
-        "-v"
-    ], env={**dict(os.environ), **env} if 'os' in globals() else env)
-    
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT / "src")}
+
+    command = [sys.executable, "-m", "pytest", "tests/", "-v"]
+    if os.environ.get("CI"):
+        # CI runs are one-shot, so skip reading and writing .pytest_cache
+        command += ["-p", "no:cacheprovider"]
+
+    # Extra arguments go straight to pytest, e.g. `run_tests.py -x --ff`
+    command += sys.argv[1:]
+
+    # Run from the project root so pytest finds its config without searching upward
+    result = subprocess.run(command, env=env, cwd=PROJECT_ROOT)
+
     return result.returncode
 
 if __name__ == "__main__":
-    import os
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -1,5 +1,7 @@
 """Tree navigation logic and utilities."""
 
+from bisect import bisect_left
+from difflib import get_close_matches
 from typing import List, Optional, Union, Tuple
 from core.tree import ConversationTree
 from core.state import ConversationState
@@ -80,21 +82,21 @@ class TreeNavigator:
         """Get navigation suggestions for invalid identifiers."""
         suggestions = []
         
-        # Get all valid identifiers
-        all_states = self.tree.get_all_states()
-        
         if isinstance(identifier, int):
-            # Suggest nearby sequence numbers
-            valid_sequences = [s.sequence_id for s in all_states]
-            close_sequences = [s for s in valid_sequences if abs(s - identifier) <= 2]
+            # Suggest nearby sequence numbers; IDs are unique, so any within 2 sit
+            # in the two slots either side of the insertion point
+            valid_sequences = self.tree.sorted_sequence_ids
+            i = bisect_left(valid_sequences, identifier)
+            window = valid_sequences[max(0, i - 2):i + 3]
+            close_sequences = [s for s in window if abs(s - identifier) <= 2]
             suggestions.extend([f"Try sequence {s}" for s in close_sequences[:3]])
         
         elif isinstance(identifier, str):
             # Suggest similar hierarchical IDs
-            valid_hierarchical = [s.hierarchical_id for s in all_states]
-            # Simple string similarity
-            similar = [h for h in valid_hierarchical if identifier in h or h in identifier]
-            suggestions.extend([f"Try '{h}'" for h in similar[:3]])
+            valid_hierarchical = [s.hierarchical_id for s in self.tree.iter_states()]
+            # Best three matches, closest first
+            similar = get_close_matches(identifier, valid_hierarchical, n=3, cutoff=0.5)
+            suggestions.extend([f"Try '{h}'" for h in similar])
         
         # Always suggest viewing the tree
         suggestions.append("Use '/states' to see all available states")
@@ -1,11 +1,15 @@
 """Conversation state model and operations."""
 
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, FrozenSet, Dict, Any, Set
 
+# Slots drop the per-instance __dict__; dataclass only supports them from Python 3.10
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, **_SLOTS)
 class ConversationState:
     """Immutable conversation state representation."""
     
@@ -37,7 +41,8 @@ class ConversationState:
     @property
     def depth(self) -> int:
         """Calculate depth in tree based on hierarchical ID."""
-        return len(self.hierarchical_id.split('.'))
+        # Counting separators scans once without building a list of parts
+        return self.hierarchical_id.count('.') + 1
     
     def with_tags(self, tags: Set[str]) -> 'ConversationState':
         """Return new state with updated tags (immutable pattern)."""
@@ -82,13 +87,15 @@ class ConversationState:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ConversationState':
         """Create state from dictionary."""
+        # IDs and model names repeat across many states (and as dict keys), so share one copy
+        parent_id = data.get('parent_id')
         return cls(
-            hierarchical_id=data['hierarchical_id'],
+            hierarchical_id=sys.intern(data['hierarchical_id']),
             sequence_id=data['sequence_id'],
-            parent_id=data.get('parent_id'),
+            parent_id=sys.intern(parent_id) if parent_id else parent_id,
             message=data['message'],
             response=data['response'],
-            model=data['model'],
+            model=sys.intern(data['model']),
             timestamp=datetime.fromisoformat(data['timestamp']),
             tags=frozenset(data.get('tags', [])),
             metadata=data.get('metadata', {})
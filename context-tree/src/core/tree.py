@@ -1,6 +1,7 @@
 """Professional tree implementation for conversation management."""
 
-from typing import Dict, List, Optional, Union, Set
+import sys
+from typing import Dict, Iterator, List, Optional, Protocol, Sequence, Set, Tuple, Union
 from collections import defaultdict, deque
 from datetime import datetime
 
@@ -8,6 +9,19 @@ from core.state import ConversationState
 from utils.errors import StateNotFoundError, NavigationError, TreeOperationError
 from utils.validators import validate_state_identifier, parse_state_identifier
 
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp from saved metadata, or None if it is missing or malformed."""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+class ChatClient(Protocol):
+    """Chat client that can send several requests concurrently, e.g. OllamaClient."""
+    
+    async def achat_many(self, batch: Sequence[Tuple[List[Dict], str]]) -> List[str]:
+        ...
+
 class ConversationTree:
     """
     Efficient tree implementation with multiple indexing strategies.
@@ -17,11 +31,20 @@ class ConversationTree:
     def __init__(self):
         self._states: Dict[str, ConversationState] = {}
         self._sequence_index: Dict[int, str] = {}        # sequence -> hierarchical_id
-        self._hierarchy_index: Dict[str, int] = {}       # hierarchical_id -> sequence
+        self._sequence_ids: List[int] = []               # ascending, for bisect lookups
         self._parent_children: Dict[str, List[str]] = defaultdict(list)  # parent -> children
         self._current_state: Optional[str] = None
         self._sequence_counter: int = 0
+        self._version: int = 0                           # bumped on every content mutation
+        self._messages_cache: Dict[str, List[Dict[str, str]]] = {}  # state -> LLM context up to it
+        self._created_at: datetime = datetime.now()
+        self._last_modified: datetime = self._created_at
         
+    @property
+    def version(self) -> int:
+        """Get mutation counter; changes whenever states are added, updated or cleared."""
+        return self._version
+    
     @property
     def current_state_id(self) -> Optional[str]:
         """Get current state hierarchical ID."""
@@ -34,6 +57,11 @@ class ConversationTree:
             return self._states.get(self._current_state)
         return None
     
+    @property
+    def sorted_sequence_ids(self) -> Sequence[int]:
+        """Get all sequence IDs in ascending order (a live view; do not modify)."""
+        return self._sequence_ids
+    
     @property
     def state_count(self) -> int:
         """Get total number of states."""
@@ -41,46 +69,26 @@ class ConversationTree:
     
     def add_state(self, parent_id: Optional[str], message: str, response: str, model: str) -> ConversationState:
         """Add new state to tree with improved ID generation."""
-        self._sequence_counter += 1
-        
-        # Generate hierarchical ID with smarter branching logic
+        # Resolve the parent's children once; they decide both the ID and the branch flag
         if parent_id is None:
-            # Root state
-            hierarchical_id = str(self._sequence_counter)
+            existing_children = ()
         else:
             if parent_id not in self._states:
                 raise StateNotFoundError(parent_id)
-            
-            # Check if parent already has children
-            existing_children = self._parent_children.get(parent_id, [])
-            
-            if len(existing_children) == 0:
-                # First child - continue the linear path (no new level)
-                hierarchical_id = str(self._sequence_counter)
-            else:
-                # Second+ child - this creates a branch, so add new level
-                branch_number = len(existing_children) + 1
-                hierarchical_id = f"{parent_id}.{branch_number}"
-        
-        # Create new state
-        state = ConversationState(
-            hierarchical_id=hierarchical_id,
-            sequence_id=self._sequence_counter,
-            parent_id=parent_id,
-            message=message,
-            response=response,
-            model=model,
-            timestamp=datetime.now()
-        )
+            existing_children = self._parent_children.get(parent_id, ())
         
-        # Determine if this creates a branch
-        is_branch = False
-        if parent_id and parent_id in self._states:
-            existing_children = self._parent_children.get(parent_id, [])
-            if len(existing_children) > 0:
-                is_branch = True
+        self._sequence_counter += 1
+        now = datetime.now()
+        
+        # Generate hierarchical ID with smarter branching logic
+        is_branch = len(existing_children) > 0
+        if is_branch:
+            # Second+ child - this creates a branch, so add new level
+            hierarchical_id = f"{parent_id}.{len(existing_children) + 1}"
+        else:
+            # Root or first child - continue the linear path (no new level)
+            hierarchical_id = str(self._sequence_counter)
         
-        # Update state with branch info
         state = ConversationState(
             hierarchical_id=hierarchical_id,
             sequence_id=self._sequence_counter,
@@ -88,7 +96,7 @@ class ConversationTree:
             message=message,
             response=response,
             model=model,
-            timestamp=datetime.now(),
+            timestamp=now,
             tags=frozenset(),
             metadata={'is_branch': is_branch}
         )
@@ -96,16 +104,57 @@ class ConversationTree:
         # Update all indexes
         self._states[hierarchical_id] = state
         self._sequence_index[self._sequence_counter] = hierarchical_id
-        self._hierarchy_index[hierarchical_id] = self._sequence_counter
+        self._sequence_ids.append(self._sequence_counter)
         
         if parent_id:
             self._parent_children[parent_id].append(hierarchical_id)
         
+        # Extend the parent's cached context so the new state never re-walks its path
+        parent_messages = self._messages_cache.get(parent_id) if parent_id else []
+        if parent_messages is not None:
+            self._messages_cache[hierarchical_id] = parent_messages + [
+                {"role": "user", "content": message},
+                {"role": "assistant", "content": response},
+            ]
+        
+        self._version += 1
+        self._last_modified = now
+        
         # Set as current state
         self._current_state = hierarchical_id
         
         return state
     
+    async def aregenerate_children(self, state_id: str, prompts: List[str], model: str,
+                                   client: ChatClient,
+                                   system_message: Optional[str] = None) -> List[ConversationState]:
+        """
+        Add one child of a state per prompt, requesting every reply concurrently.
+        
+        Args:
+            state_id: Parent state the new branches grow from
+            prompts: User message for each new child
+            model: Model name to use
+            client: Chat client providing achat_many
+            system_message: Optional system prompt sent ahead of the history
+            
+        Returns:
+            List[ConversationState]: New children in prompt order; the last one
+            becomes the current state, as with add_state
+        """
+        if state_id not in self._states:
+            raise StateNotFoundError(state_id)
+        
+        context = self.get_conversation_messages(state_id)
+        if system_message:
+            context.insert(0, {"role": "system", "content": system_message})
+        
+        batch = [(context + [{"role": "user", "content": prompt}], model) for prompt in prompts]
+        responses = await client.achat_many(batch)
+        
+        return [self.add_state(state_id, prompt, response, model)
+                for prompt, response in zip(prompts, responses)]
+    
     def find_state(self, identifier: Union[int, str]) -> Optional[ConversationState]:
         """Find state by sequence ID or hierarchical ID."""
         if isinstance(identifier, int):
@@ -133,8 +182,9 @@ class ConversationTree:
     
     def get_children(self, state_id: str) -> List[ConversationState]:
         """Get children of specified state."""
-        children_ids = self._parent_children.get(state_id, [])
-        return [self._states[child_id] for child_id in children_ids if child_id in self._states]
+        # Child IDs are only ever recorded for states that exist, so no membership check
+        states = self._states
+        return [states[child_id] for child_id in self._parent_children.get(state_id, ())]
     
     def get_parent(self, state_id: str) -> Optional[ConversationState]:
         """Get parent of specified state."""
@@ -155,13 +205,16 @@ class ConversationTree:
     def get_path_to_root(self, state_id: str) -> List[ConversationState]:
         """Get path from specified state to root."""
         path = []
+        states = self._states
         current_id = state_id
         
-        while current_id and current_id in self._states:
-            state = self._states[current_id]
-            path.insert(0, state)
+        # Collect leaf-to-root, then reverse once instead of shifting on every insert
+        while current_id and current_id in states:
+            state = states[current_id]
+            path.append(state)
             current_id = state.parent_id
         
+        path.reverse()
         return path
     
     def get_subtree(self, state_id: str) -> List[ConversationState]:
@@ -181,10 +234,16 @@ class ConversationTree:
         
         return subtree
     
+    def iter_states(self) -> Iterator[ConversationState]:
+        """Iterate over all states in sequence ID order without building a list."""
+        # _sequence_index is filled in ascending sequence order, so no sort is needed
+        states = self._states
+        for hierarchical_id in self._sequence_index.values():
+            yield states[hierarchical_id]
+    
     def get_all_states(self) -> List[ConversationState]:
         """Get all states sorted by sequence ID."""
-        return [self._states[self._sequence_index[seq]] 
-                for seq in sorted(self._sequence_index.keys())]
+        return list(self.iter_states())
     
     def get_root_states(self) -> List[ConversationState]:
         """Get all root states."""
@@ -199,7 +258,14 @@ class ConversationTree:
         if updated_state.hierarchical_id != state_id:
             return False
         
+        # Cached contexts only go stale if the conversation text itself changed
+        current = self._states[state_id]
+        if updated_state.message != current.message or updated_state.response != current.response:
+            self._messages_cache.clear()
+        
         self._states[state_id] = updated_state
+        self._version += 1
+        self._last_modified = datetime.now()
         return True
     
     def get_conversation_messages(self, state_id: Optional[str] = None) -> List[Dict[str, str]]:
@@ -210,23 +276,50 @@ class ConversationTree:
         if not state_id:
             return []
         
-        path = self.get_path_to_root(state_id)
-        messages = []
-        
-        for state in path:
-            messages.append({"role": "user", "content": state.message})
-            messages.append({"role": "assistant", "content": state.response})
+        cached = self._messages_cache.get(state_id)
+        if cached is None:
+            # Walk up once, collecting each turn newest-first, and stop early at an
+            # ancestor whose context is already cached
+            states = self._states
+            cache = self._messages_cache
+            turns = []
+            base: List[Dict[str, str]] = []
+            current_id = state_id
+            while current_id and current_id in states:
+                if turns and current_id in cache:
+                    base = cache[current_id]
+                    break
+                state = states[current_id]
+                turns.append(state)
+                current_id = state.parent_id
+            
+            turns.reverse()
+            cached = base + [
+                message
+                for state in turns
+                for message in (
+                    {"role": "user", "content": state.message},
+                    {"role": "assistant", "content": state.response},
+                )
+            ]
+            
+            if turns:
+                cache[state_id] = cached
         
-        return messages
+        # Hand out a copy so callers can append without touching the cache
+        return list(cached)
     
     def clear(self) -> None:
         """Clear all states and reset tree."""
         self._states.clear()
         self._sequence_index.clear()
-        self._hierarchy_index.clear()
+        self._sequence_ids.clear()
         self._parent_children.clear()
+        self._messages_cache.clear()
         self._current_state = None
         self._sequence_counter = 0
+        self._version += 1
+        self._last_modified = datetime.now()
     
     def to_dict(self) -> Dict:
         """Convert tree to dictionary for serialization."""
@@ -235,7 +328,8 @@ class ConversationTree:
             'current_state': self._current_state,
             'sequence_counter': self._sequence_counter,
             'metadata': {
-                'created_at': datetime.now().isoformat(),
+                'created_at': self._created_at.isoformat(),
+                'last_modified': self._last_modified.isoformat(),
                 'state_count': len(self._states)
             }
         }
@@ -247,16 +341,36 @@ class ConversationTree:
         tree._sequence_counter = data.get('sequence_counter', 0)
         tree._current_state = data.get('current_state')
         
-        # Rebuild states and indexes
+        # Rebuild states and indexes in sequence order so insertion-ordered indexes stay sorted
         states_data = data.get('states', {})
-        for state_id, state_data in states_data.items():
+        ordered_items = sorted(states_data.items(), key=lambda item: item[1]['sequence_id'])
+        # Retried prompts and repeated replies across branches share one string per load
+        texts: Dict[str, str] = {}
+        for state_id, state_data in ordered_items:
+            state_data = dict(
+                state_data,
+                message=texts.setdefault(state_data['message'], state_data['message']),
+                response=texts.setdefault(state_data['response'], state_data['response']),
+            )
             state = ConversationState.from_dict(state_data)
+            state_id = sys.intern(state_id)
             tree._states[state_id] = state
             tree._sequence_index[state.sequence_id] = state_id
-            tree._hierarchy_index[state_id] = state.sequence_id
+            tree._sequence_ids.append(state.sequence_id)
             
             # Rebuild parent-children relationships
             if state.parent_id:
                 tree._parent_children[state.parent_id].append(state_id)
         
+        # Keep the original timestamps so a load/save round-trip doesn't restamp the tree.
+        # They are informational, so missing or malformed values fall back to the root's
+        metadata = data.get('metadata', {})
+        if tree._sequence_ids:
+            root_id = tree._sequence_index[tree._sequence_ids[0]]
+            fallback = tree._states[root_id].timestamp
+        else:
+            fallback = tree._created_at
+        tree._created_at = _parse_timestamp(metadata.get('created_at')) or fallback
+        tree._last_modified = _parse_timestamp(metadata.get('last_modified')) or tree._created_at
+        
         return tree
\ No newline at end of file
@@ -1,33 +1,77 @@
 """LLM client with streaming support."""
 
+import asyncio
+import time
+from functools import lru_cache
 import requests
-from typing import List, Dict, Optional, Generator
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, Generator, Sequence, Tuple, Union
+from llm.retry import with_retry
 from llm.streaming import StreamingHandler
 from utils.errors import LLMError
+from utils.jsonio import JSON_HEADERS, dumps, loads
+
+# How long a fetched model list is reused before /api/tags is polled again
+_MODELS_TTL = 10.0
+
+@lru_cache(maxsize=64)
+def _keep_alive_body(model: str, keep_alive: Union[int, str]) -> bytes:
+    """Encoded empty-chat body that loads or unloads a model; identical per (model, keep_alive)."""
+    return dumps({"model": model, "messages": [], "keep_alive": keep_alive})
 
 class OllamaClient:
     """Ollama client with streaming and error handling."""
     
     def __init__(self, base_url: str = "http://localhost:11434"):
         self.base_url = base_url.rstrip('/')
-        self.streaming_handler = StreamingHandler()
+        # One keep-alive session for every call, shared with the streaming handler
+        self._session = requests.Session()
+        # pool_block makes concurrent calls past 20 wait for a free connection
+        # instead of opening throwaway ones, so the pool really caps concurrency
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=0, pool_block=True)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self.streaming_handler = StreamingHandler(session=self._session)
+        self._models_cache: Optional[Tuple[float, List[str]]] = None
+    
+    def close(self) -> None:
+        """Close pooled connections to Ollama."""
+        self._session.close()
         
+    def invalidate_cache(self) -> None:
+        """Forget cached server state, e.g. after models are pulled or removed."""
+        self._models_cache = None
+    
     def is_connected(self) -> bool:
-        """Check if Ollama is accessible."""
+        """Check if Ollama is accessible, refreshing the model list cache as a side benefit."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
-        except Exception:
+            self.get_available_models(force=True)
+            return True
+        except LLMError:
             return False
     
-    def get_available_models(self) -> List[str]:
-        """Get list of available models from Ollama."""
+    def get_available_models(self, force: bool = False) -> List[str]:
+        """
+        Get list of available models from Ollama.
+        
+        Args:
+            force: Bypass the short-lived cache and query Ollama again
+            
+        Returns:
+            List[str]: Installed model names
+        """
+        now = time.monotonic()
+        if not force and self._models_cache and now - self._models_cache[0] < _MODELS_TTL:
+            return list(self._models_cache[1])
+        
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=10)
             response.raise_for_status()
             
-            models_data = response.json()
-            return [model["name"] for model in models_data.get("models", [])]
+            models_data = loads(response.content)
+            models = [model["name"] for model in models_data.get("models", [])]
+            self._models_cache = (now, models)
+            return list(models)
             
         except requests.exceptions.RequestException as e:
             raise LLMError(f"Failed to fetch models: {e}")
@@ -75,14 +119,18 @@ class OllamaClient:
                 "stream": False
             }
             
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=60
-            )
-            response.raise_for_status()
+            def post():
+                response = self._session.post(
+                    f"{self.base_url}/api/chat",
+                    data=dumps(payload),
+                    headers=JSON_HEADERS,
+                    timeout=60
+                )
+                response.raise_for_status()
+                return response
             
-            result = response.json()
+            response = with_retry(post)
+            result = loads(response.content)
             return result["message"]["content"]
             
         except requests.exceptions.Timeout:
@@ -96,16 +144,46 @@ class OllamaClient:
         except Exception as e:
             raise LLMError(f"Chat failed: {e}")
     
+    async def achat(self, messages: List[Dict], model: str) -> str:
+        """
+        Send a chat request without blocking the event loop.
+        
+        The request runs on the default executor and shares the client's
+        connection pool, so concurrent calls reuse keep-alive connections.
+        
+        Args:
+            messages: List of message dictionaries
+            model: Model name to use
+            
+        Returns:
+            str: Complete response text
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.chat, messages, model)
+    
+    async def achat_many(self, batch: Sequence[Tuple[List[Dict], str]]) -> List[str]:
+        """
+        Send several chat requests concurrently.
+        
+        Args:
+            batch: (messages, model) pairs
+            
+        Returns:
+            List[str]: Response texts in the same order as the requests
+        """
+        return list(await asyncio.gather(*(self.achat(messages, model) for messages, model in batch)))
+    
+    def chat_many(self, batch: Sequence[Tuple[List[Dict], str]]) -> List[str]:
+        """Send several chat requests concurrently from synchronous code."""
+        return asyncio.run(self.achat_many(batch))
+    
     def unload_model(self, model: str) -> bool:
         """Unload model from memory to clear context."""
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": [],
-                    "keep_alive": 0
-                },
+                data=_keep_alive_body(model, 0),
+                headers=JSON_HEADERS,
                 timeout=10
             )
             return response.status_code == 200
@@ -113,18 +191,28 @@ class OllamaClient:
             return False
     
     def check_model_loaded(self, model: str) -> bool:
-        """Check if a model is currently loaded."""
+        """
+        Check if a model is currently loaded.
+        
+        Reads Ollama's list of running models, so the check neither loads the
+        model nor generates tokens. Servers without /api/ps get an empty chat
+        request instead, which returns once the model is resident and decodes
+        nothing.
+        """
         try:
-            # Try a minimal request to see if model responds quickly
-            response = requests.post(
+            response = self._session.get(f"{self.base_url}/api/ps", timeout=5)
+            if response.status_code != 404:
+                response.raise_for_status()
+                running = {m.get("name") for m in loads(response.content).get("models", [])}
+                # Ollama resolves an untagged name to its :latest tag
+                return model in running or f"{model}:latest" in running
+            
+            response = self._session.post(
                 f"{self.base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": [{"role": "user", "content": "hi"}],
-                    "stream": False
-                },
+                data=_keep_alive_body(model, "5m"),
+                headers=JSON_HEADERS,
                 timeout=5
             )
             return response.status_code == 200
         except Exception:
-            return False
\ No newline at end of file
+            return False
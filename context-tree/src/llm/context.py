@@ -0,0 +1,33 @@
+"""Context window management for chat requests."""
+
+from typing import Dict, List
+
+
+def trim_messages(messages: List[Dict[str, str]], max_chars: int) -> List[Dict[str, str]]:
+    """
+    Drop the oldest conversation turns until the messages fit a character budget.
+
+    A leading system message and the final message are always kept, and the
+    kept history never starts on an assistant reply.
+
+    Args:
+        messages: Chat messages, oldest first
+        max_chars: Maximum total content length to send
+
+    Returns:
+        List[Dict[str, str]]: The messages, or a trimmed copy when over budget
+    """
+    total = sum(len(m["content"]) for m in messages)
+    if total <= max_chars:
+        return messages
+
+    head = 1 if messages and messages[0]["role"] == "system" else 0
+    start = head
+    last = len(messages) - 1
+
+    # Slide the window forward one message at a time, tracking the running size
+    while start < last and (total > max_chars or messages[start]["role"] == "assistant"):
+        total -= len(messages[start]["content"])
+        start += 1
+
+    return messages[:head] + messages[start:]
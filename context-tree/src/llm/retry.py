@@ -0,0 +1,46 @@
+"""Retry with exponential backoff for transient Ollama failures."""
+
+import random
+import time
+from typing import Callable, TypeVar
+
+import requests
+
+T = TypeVar("T")
+
+
+def is_transient(error: Exception) -> bool:
+    """Check whether a request error is worth retrying (connection, timeout or 5xx)."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return 500 <= error.response.status_code < 600
+    return False
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0, jitter: float = 0.5) -> float:
+    """Get the delay before retry number attempt + 1, with random jitter to spread out clients."""
+    return min(cap, base * 2 ** attempt * (1 + random.random() * jitter))
+
+
+def with_retry(request: Callable[[], T], attempts: int = 3) -> T:
+    """
+    Call request, retrying transient failures with exponential backoff.
+
+    Args:
+        request: Zero-argument callable that performs the request
+        attempts: Total number of tries, including the first
+
+    Returns:
+        T: Whatever request returns on success
+
+    Raises:
+        requests.exceptions.RequestException: The last error, or the first non-transient one
+    """
+    for attempt in range(attempts):
+        try:
+            return request()
+        except requests.exceptions.RequestException as e:
+            if attempt == attempts - 1 or not is_transient(e):
+                raise
+            time.sleep(backoff_delay(attempt))
@@ -1,17 +1,18 @@
 """Streaming response handling with memory management."""
 
-import json
 import requests
-from typing import Iterator, Generator
-from collections import deque
+from typing import Iterator, Generator, List, Optional
+from llm.retry import with_retry
 from utils.errors import StreamingError, LLMError
+from utils.jsonio import JSON_HEADERS, dumps, loads
 
 class StreamingHandler:
     """Handle streaming responses with memory management."""
     
-    def __init__(self, buffer_size: int = 1024):
-        self._buffer_size = buffer_size
-        self._response_buffer = deque(maxlen=buffer_size)
+    def __init__(self, session: Optional[requests.Session] = None):
+        self._session = session or requests.Session()
+        # Unbounded on purpose: a capped buffer silently dropped the start of long replies
+        self._response_buffer: List[str] = []
     
     def stream_chat(self, url: str, payload: dict, timeout: int = 60) -> Generator[str, None, str]:
         """
@@ -25,32 +26,45 @@ class StreamingHandler:
         """
         self._response_buffer.clear()
         
-        try:
-            response = requests.post(
+        body = dumps(payload)
+        
+        def open_stream():
+            response = self._session.post(
                 url,
-                json=payload,
+                data=body,
+                headers=JSON_HEADERS,
                 stream=True,
                 timeout=timeout
             )
-            response.raise_for_status()
-            
-            for line in response.iter_lines(decode_unicode=True):
-                if line:
-                    try:
-                        chunk = json.loads(line)
-                        content = chunk.get('message', {}).get('content', '')
-                        
-                        if content:
-                            self._response_buffer.append(content)
-                            yield content
-                            
-                        # Check if streaming is done
-                        if chunk.get('done', False):
-                            break
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError:
+                response.close()
+                raise
+            return response
+        
+        try:
+            # Only opening the stream is retried; a failure mid-reply is reported as-is.
+            # Closing the response hands its connection back to the session's pool
+            with with_retry(open_stream) as response:
+                # JSON parses bytes directly, so skip decoding each line to str first
+                for line in response.iter_lines():
+                    if line:
+                        try:
+                            chunk = loads(line)
+                            content = chunk.get('message', {}).get('content', '')
                             
-                    except json.JSONDecodeError:
-                        # Skip malformed JSON lines
-                        continue
+                            if content:
+                                self._response_buffer.append(content)
+                                yield content
+                                
+                            # Check if streaming is done
+                            if chunk.get('done', False):
+                                break
+                                
+                        except ValueError:
+                            # Skip malformed JSON lines (and lines that are not valid UTF-8)
+                            continue
                         
         except requests.exceptions.Timeout:
             raise StreamingError("Request timed out. The model might be processing a complex request.")
@@ -5,22 +5,70 @@ import os
 import signal
 import readline
 import atexit
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
 from rich.text import Text
 
 from core.tree import ConversationTree
 from core.navigation import TreeNavigator
 from llm.client import OllamaClient
+from llm.context import trim_messages
 from storage.persistence import ConversationPersistence
 from ui.commands import CommandRegistry, AppContext
 from ui.display import StreamingDisplay
-from ui.interactive import InteractiveSelector, InteractiveTreeBrowser, TagSelector, LoadSelector
+from ui.interactive import InteractiveSelector, InteractiveTreeBrowser, TagSelector, LoadSelector, read_choice
 from utils.errors import TreeChatError, LLMError
 
+# Chat prompt pieces; the opening bracket is escaped so Rich does not read the label as markup
+_PROMPT_TEMPLATE = "\n\\[{label}] You: "
+_PROMPT_NEW = _PROMPT_TEMPLATE.format(label="new")
+_PROMPT_UNKNOWN = _PROMPT_TEMPLATE.format(label="unknown")
+_BRANCH_MARKER = " 🌿"
+
+# Readline history is appended to disk after this many new entries, and again at exit
+_HISTORY_FLUSH_EVERY = 20
+
+# Help table, formatted once; escaped so arguments like [name] are not read as markup
+_HELP_COMMAND_LINES = [
+    escape(f"  {cmd:<20} - {desc}")
+    for cmd, desc in (
+        ("/help, /h", "Show this help message"),
+        ("/goto <id>, /g, /cd", "Navigate to any state by sequence or hierarchical ID"),
+        ("/up, /u", "Navigate to parent state"),
+        ("/down <n>, /d", "Navigate to specific child branch"),
+        ("/states, /s", "Show conversation tree and all states"),
+        ("/tag <text>, /t", "Tag current state with custom text"),
+        ("/tree", "Interactive tree browser with live preview"),
+        ("/save [name], /sv", "Save conversation tree to file"),
+        ("/load, /l", "Load conversation tree from file"),
+        ("/new, /n", "Start new conversation"),
+        ("/budget [n|off], /b", "Limit history sent per message to n characters"),
+        ("/quit, /q", "Exit the application"),
+    )
+]
+
+# Full help screen, assembled once and printed in a single write
+_HELP_TEXT = "\n".join([
+    "\n📖 Available Commands:",
+    *_HELP_COMMAND_LINES,
+    "\n💬 Chat:",
+    "  Just type your message to chat normally!",
+    "\n🏷️  Tagging:",
+    "  /t debugging memory leak    - Tag without quotes",
+    "  /t                          - Interactive tag menu",
+    "\n🌳 Navigation:",
+    "  /goto 3        - Go to sequence number 3",
+    "  /goto 1.2.1    - Go to hierarchical position 1.2.1",
+    "  /tree          - Interactive tree browser",
+    "\n💡 Pro Tip: When you revert to a previous state and continue,",
+    "   a new branch will be created automatically!",
+])
+
 class OllamaTreeChatApp:
     """Main application class."""
     
@@ -32,13 +80,28 @@ class OllamaTreeChatApp:
         self.tree = ConversationTree()
         self.navigator = TreeNavigator(self.tree)
         self.ollama_client = OllamaClient()
+        atexit.register(self.ollama_client.close)
         self.persistence = ConversationPersistence()
         self.command_registry = CommandRegistry()
         
         # Application state
         self.current_model: Optional[str] = None
         self.system_message: Optional[str] = None
+        self.max_context_chars: Optional[int] = None  # None sends the full history
         self.recent_tags: list = []
+        self._prompt_cache: Optional[tuple] = None  # ((tree, current id, version), prompt)
+        self._history_file: Optional[str] = None     # set when readline history is enabled
+        self._history_saved: int = 0                 # history entries already in the file
+        
+        # UI actions requested by commands, keyed by CommandResult.message
+        self._result_handlers = {
+            "show_help": lambda data: self.show_help(),
+            "interactive_tag": self.handle_interactive_tag,
+            "show_tree": self.display.print_tree,
+            "show_load_menu": self.handle_load_menu,
+            "interactive_tree": self.handle_interactive_tree,
+            "set_budget": self.handle_set_budget,
+        }
         
         # Setup
         self.setup_readline()
@@ -46,28 +109,64 @@ class OllamaTreeChatApp:
     
     def setup_readline(self):
         """Setup readline for better input handling."""
+        # Piped or scripted input gets no benefit from line editing or history
+        if not sys.stdin.isatty():
+            return
+        
         try:
             readline.parse_and_bind("tab: complete")
             
+            # Lines are added by hand in chat_loop so /commands stay out of history
+            readline.set_auto_history(False)
+            
+            # Every history write truncates the file to this many entries, so the
+            # file read back at startup never holds more than the cap
+            readline.set_history_length(1000)
+            
             history_file = Path.home() / ".ollama_chat_history"
             try:
                 readline.read_history_file(str(history_file))
             except FileNotFoundError:
                 pass
             
-            atexit.register(readline.write_history_file, str(history_file))
-            readline.set_history_length(1000)
+            # Only entries added this session get appended, in batches and at exit
+            self._history_file = str(history_file)
+            self._history_saved = readline.get_current_history_length()
+            atexit.register(self.flush_history)
             
         except ImportError:
             pass  # readline not available
     
+    def flush_history(self):
+        """Append history entries added since the last flush to the history file."""
+        if self._history_file is None:
+            return
+        
+        current = readline.get_current_history_length()
+        new_entries = current - self._history_saved
+        if new_entries <= 0:
+            return
+        
+        try:
+            # append_history_file cannot create the file, so the first flush writes it
+            if hasattr(readline, "append_history_file") and os.path.exists(self._history_file):
+                readline.append_history_file(new_entries, self._history_file)
+            else:
+                readline.write_history_file(self._history_file)
+            self._history_saved = current
+        except OSError:
+            pass  # History is a convenience; never fail the session over it
+    
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful exit."""
+        # Ctrl-C raises KeyboardInterrupt, which prompts treat as cancel. Termination
+        # raises SystemExit instead: nothing catches it, but it still unwinds finally
+        # blocks (terminal restore) and runs atexit (history write)
         def signal_handler(sig, frame):
-            self.display.print_warning("Goodbye!")
-            sys.exit(0)
+            raise SystemExit(128 + sig)
         
-        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
     
     def print_header(self):
         """Print application header."""
@@ -80,7 +179,7 @@ class OllamaTreeChatApp:
             if self.tree.current_state_id:
                 current_state = self.tree.current_state
                 if current_state:
-                    branch_info = " 🌿" if not current_state.is_root else ""
+                    branch_info = _BRANCH_MARKER if not current_state.is_root else ""
                     info_lines.append(f"📍 Current: {current_state.display_name}{branch_info}")
         
         if info_lines:
@@ -91,13 +190,14 @@ class OllamaTreeChatApp:
         
         self.console.print(panel)
     
-    def select_model(self) -> bool:
-        """Let user select a model."""
-        try:
-            models = self.ollama_client.get_available_models()
-        except LLMError as e:
-            self.display.print_error(f"Failed to get models: {e}")
-            return False
+    def select_model(self, models: Optional[List[str]] = None) -> bool:
+        """Let user select a model, fetching the list unless one is given."""
+        if models is None:
+            try:
+                models = self.ollama_client.get_available_models()
+            except LLMError as e:
+                self.display.print_error(f"Failed to get models: {e}")
+                return False
         
         if not models:
             self.display.print_error("No models found. Make sure Ollama is running and has models installed.")
@@ -107,9 +207,13 @@ class OllamaTreeChatApp:
         for i, model in enumerate(models, 1):
             self.console.print(f"  {i}. {model}")
         
+        # The model list is fixed for this prompt, so build the retry strings once
+        prompt = f"\nSelect model (1-{len(models)}) or 'q' to quit: "
+        range_error = f"Please enter a number between 1 and {len(models)}"
+        
         while True:
             try:
-                choice = self.console.input(f"\nSelect model (1-{len(models)}) or 'q' to quit: ").strip()
+                choice = read_choice(prompt).strip()
                 
                 if choice.lower() == 'q':
                     return False
@@ -120,7 +224,7 @@ class OllamaTreeChatApp:
                     self.display.print_success(f"Selected model: {self.current_model}")
                     return True
                 else:
-                    self.display.print_error(f"Please enter a number between 1 and {len(models)}")
+                    self.display.print_error(range_error)
             except ValueError:
                 self.display.print_error("Please enter a valid number or 'q' to quit")
             except (EOFError, KeyboardInterrupt):
@@ -146,18 +250,19 @@ class OllamaTreeChatApp:
     def handle_chat_message(self, message: str):
         """Handle regular chat message with streaming."""
         try:
-            # Build message history
-            messages = []
-            if self.system_message and self.tree.state_count == 0:
-                messages.append({"role": "system", "content": self.system_message})
-            
-            # Get conversation history
-            conversation_messages = self.tree.get_conversation_messages()
-            messages.extend(conversation_messages)
+            # Build message history on the tree's copy of the cached context
+            messages = self.tree.get_conversation_messages()
+            if self.system_message:
+                # Lead every request with the same system turn so each payload is an
+                # append-only extension of the last and Ollama can reuse its prompt cache
+                messages.insert(0, {"role": "system", "content": self.system_message})
             
             # Add new user message
             messages.append({"role": "user", "content": message})
             
+            if self.max_context_chars is not None:
+                messages = trim_messages(messages, self.max_context_chars)
+            
             # Stream response
             response_generator = self.ollama_client.chat_stream(messages, self.current_model)
             complete_response = self.display.stream_response(response_generator)
@@ -172,8 +277,7 @@ class OllamaTreeChatApp:
             
             # Show branch creation info if applicable
             if state.is_branch:  # Now uses the property
-                parent_children = self.tree.get_children(state.parent_id) if state.parent_id else []
-                siblings = [s for s in parent_children if s.hierarchical_id != state.hierarchical_id]
+                siblings = self.tree.get_siblings(state.hierarchical_id)
                 branch_number = len(siblings) + 1
                 self.display.print_info(f"Created branch {state.display_name} (Branch {branch_number}) from {state.parent_id}")
                 if siblings:
@@ -191,22 +295,16 @@ class OllamaTreeChatApp:
             ollama_client=self.ollama_client,
             persistence=self.persistence,
             current_model=self.current_model,
-            system_message=self.system_message
+            system_message=self.system_message,
+            max_context_chars=self.max_context_chars
         )
         
         result = self.command_registry.execute(command_line, context)
         
         if result.success:
-            if result.message == "show_help":
-                self.show_help()
-            elif result.message == "interactive_tag":
-                self.handle_interactive_tag(result.data)
-            elif result.message == "show_tree":
-                self.display.print_tree(result.data)
-            elif result.message == "show_load_menu":
-                self.handle_load_menu(result.data)
-            elif result.message == "interactive_tree":
-                self.handle_interactive_tree(result.data)
+            handler = self._result_handlers.get(result.message)
+            if handler:
+                handler(result.data)
             elif result.message:
                 self.display.print_success(result.message)
             
@@ -262,28 +360,53 @@ class OllamaTreeChatApp:
             self.tree.navigate_to(selected_state.hierarchical_id)
             self.display.print_success(f"Navigated to {selected_state.display_name}")
     
+    def handle_set_budget(self, max_chars):
+        """Handle context budget changes."""
+        self.max_context_chars = max_chars
+        if max_chars is None:
+            self.display.print_success("Context budget off: full history will be sent")
+        else:
+            self.display.print_success(f"Context budget set to {max_chars} characters")
+    
+    def _chat_prompt(self) -> str:
+        """Get the input prompt for the current state, rebuilt only when the position or tree changes."""
+        tree = self.tree
+        key = (tree, tree.current_state_id, tree.version)
+        if self._prompt_cache is not None and self._prompt_cache[0] == key:
+            return self._prompt_cache[1]
+        
+        # Show current context with enhanced styling
+        if tree.current_state_id:
+            current_state = tree.current_state
+            if current_state:
+                branch_indicator = _BRANCH_MARKER if current_state.is_branch else ""
+                prompt = _PROMPT_TEMPLATE.format(label=f"{current_state.display_name}{branch_indicator}")
+            else:
+                prompt = _PROMPT_UNKNOWN
+        else:
+            prompt = _PROMPT_NEW
+        
+        self._prompt_cache = (key, prompt)
+        return prompt
+    
     def chat_loop(self):
         """Main chat loop."""
         self.console.print("\n💬 Chat started! Type your message or use commands (type /help for help)")
         
         while True:
             try:
-                # Show current context with enhanced styling
-                if self.tree.current_state_id:
-                    current_state = self.tree.current_state
-                    if current_state:
-                        branch_indicator = " 🌿" if current_state.is_branch else ""  # Use property
-                        prompt = f"\n[{current_state.display_name}{branch_indicator}] You: "
-                    else:
-                        prompt = "\n[unknown] You: "
-                else:
-                    prompt = "\n[new] You: "
-                
-                user_input = self.console.input(prompt).strip()
+                user_input = self.console.input(self._chat_prompt()).strip()
                 
                 if not user_input:
                     continue
                 
+                if self._history_file is not None and not user_input.startswith('/'):
+                    readline.add_history(user_input)
+                
+                if self._history_file is not None and \
+                        readline.get_current_history_length() - self._history_saved >= _HISTORY_FLUSH_EVERY:
+                    self.flush_history()
+                
                 # Handle commands
                 if user_input.startswith('/'):
                     should_exit = self.handle_command(user_input)
@@ -309,20 +432,27 @@ class OllamaTreeChatApp:
             if os.getenv('TERM_PROGRAM') == 'iTerm.app':
                 print('\033]0;Ollama Context Tree Chat\007', end='')  # Set window title
             
-            self.print_header()
-            
-            self.console.print("\n🌳 Welcome to Ollama Context Tree Chat v2.0!")
-            self.console.print("Professional CLI for branching LLM conversations")
-            self.console.print("Navigate conversation trees to avoid context pollution\n")
-            
-            # Check Ollama connection
-            if not self.ollama_client.is_connected():
-                self.display.print_error("Cannot connect to Ollama.")
-                self.console.print("Please make sure Ollama is running with: ollama serve")
-                return
+            # Fetch the model list while the banner prints; a successful fetch
+            # also confirms that Ollama is reachable
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                models_future = executor.submit(self.ollama_client.get_available_models)
+                
+                self.print_header()
+                
+                self.console.print("\n🌳 Welcome to Ollama Context Tree Chat v2.0!")
+                self.console.print("Professional CLI for branching LLM conversations")
+                self.console.print("Navigate conversation trees to avoid context pollution\n")
+                
+                # Check Ollama connection
+                try:
+                    models = models_future.result()
+                except LLMError:
+                    self.display.print_error("Cannot connect to Ollama.")
+                    self.console.print("Please make sure Ollama is running with: ollama serve")
+                    return
             
             # Model selection
-            if not self.select_model():
+            if not self.select_model(models):
                 return
             
             # Optional system message
@@ -337,39 +467,7 @@ class OllamaTreeChatApp:
 
     def show_help(self):
         """Show help information."""
-        self.console.print("\n📖 Available Commands:")
-        
-        commands_info = [
-            ("/help, /h", "Show this help message"),
-            ("/goto <id>, /g, /cd", "Navigate to any state by sequence or hierarchical ID"),
-            ("/up, /u", "Navigate to parent state"),
-            ("/down <n>, /d", "Navigate to specific child branch"),
-            ("/states, /s", "Show conversation tree and all states"),
-            ("/tag <text>, /t", "Tag current state with custom text"),
-            ("/tree", "Interactive tree browser with live preview"),
-            ("/save [name], /sv", "Save conversation tree to file"),
-            ("/load, /l", "Load conversation tree from file"),
-            ("/new, /n", "Start new conversation"),
-            ("/quit, /q", "Exit the application"),
-        ]
-        
-        for cmd, desc in commands_info:
-            self.console.print(f"  {cmd:<20} - {desc}")
-        
-        self.console.print("\n💬 Chat:")
-        self.console.print("  Just type your message to chat normally!")
-        
-        self.console.print("\n🏷️  Tagging:")
-        self.console.print("  /t debugging memory leak    - Tag without quotes")
-        self.console.print("  /t                          - Interactive tag menu")
-        
-        self.console.print("\n🌳 Navigation:")
-        self.console.print("  /goto 3        - Go to sequence number 3")
-        self.console.print("  /goto 1.2.1    - Go to hierarchical position 1.2.1")
-        self.console.print("  /tree          - Interactive tree browser")
-        
-        self.console.print("\n💡 Pro Tip: When you revert to a previous state and continue,")
-        self.console.print("   a new branch will be created automatically!")
+        self.console.print(_HELP_TEXT)
 
 def main():
     """Entry point for the application."""
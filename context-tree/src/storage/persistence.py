@@ -1,28 +1,37 @@
 """Save/load operations for conversation trees."""
 
-import json
+import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 
 from core.tree import ConversationTree
 from utils.errors import PersistenceError
+from utils.jsonio import dump, dumps, loads
 from utils.validators import validate_filename
 
+# Small sidecar next to each save holding just its metadata, so listings skip the full tree
+_META_SUFFIX = '.meta.json'
+
 class ConversationPersistence:
     """Handle saving and loading conversation trees."""
     
     def __init__(self, save_directory: Path = None):
         self.save_directory = save_directory or Path.home() / ".ollama_conversations" / "trees"
         self.save_directory.mkdir(parents=True, exist_ok=True)
+        # Last listing, reused while the directory's mtime is unchanged
+        self._list_cache: Optional[List[Dict[str, str]]] = None
+        self._list_cache_mtime: int = -1
     
-    def save_conversation(self, tree: ConversationTree, name: Optional[str] = None) -> str:
+    def save_conversation(self, tree: ConversationTree, name: Optional[str] = None,
+                          pretty: bool = False) -> str:
         """
         Save conversation tree to file.
         
         Args:
             tree: ConversationTree to save
             name: Optional custom name, otherwise auto-generated
+            pretty: Indent the JSON for reading by hand; saves are compact by default
             
         Returns:
             str: Filename that was saved
@@ -38,6 +47,9 @@ class ConversationPersistence:
         if not name.endswith('.json'):
             name += '.json'
         
+        if name.endswith(_META_SUFFIX):
+            raise PersistenceError(f"Invalid filename: {name} (reserved for metadata)")
+        
         filepath = self.save_directory / name
         
         try:
@@ -49,8 +61,21 @@ class ConversationPersistence:
                 'version': '2.0.0'
             })
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Encode into a temp file and swap it in, so a crash never leaves a truncated save
+            temp_path = filepath.with_name(name + '.tmp')
+            try:
+                with open(temp_path, 'wb') as f:
+                    dump(data, f, pretty=pretty)
+                os.replace(temp_path, filepath)
+            finally:
+                if temp_path.exists():
+                    temp_path.unlink()
+            
+            # Written after the tree, so a sidecar is never newer than a half-written save
+            self._meta_path(name).write_bytes(dumps(data['metadata']))
+            # The replace bumps the directory mtime, but two saves inside one timestamp
+            # tick can leave it unchanged, so drop the cached listing explicitly
+            self._list_cache_mtime = -1
             
             return name
             
@@ -76,13 +101,16 @@ class ConversationPersistence:
             raise PersistenceError(f"File not found: {filename}")
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            try:
+                data = loads(filepath.read_bytes())
+            except ValueError as e:
+                # JSONDecodeError from either backend, or bytes that are not UTF-8
+                raise PersistenceError(f"Invalid JSON in file {filename}: {e}")
             
             return ConversationTree.from_dict(data)
             
-        except json.JSONDecodeError as e:
-            raise PersistenceError(f"Invalid JSON in file {filename}: {e}")
+        except PersistenceError:
+            raise
         except Exception as e:
             raise PersistenceError(f"Failed to load conversation: {e}")
     
@@ -93,20 +121,39 @@ class ConversationPersistence:
         Returns:
             List of dictionaries with conversation info
         """
+        mtime = self.save_directory.stat().st_mtime_ns
+        if self._list_cache is not None and mtime == self._list_cache_mtime:
+            return list(self._list_cache)
+        
         conversations = []
         
-        for filepath in self.save_directory.glob("*.json"):
+        # scandir yields entries with cached type/stat info from the directory read
+        with os.scandir(self.save_directory) as entries:
+            json_entries = {e.name: e for e in entries if e.name.endswith('.json') and e.is_file()}
+        
+        for name, entry in json_entries.items():
+            if name.endswith(_META_SUFFIX):
+                continue
+            
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                stat = entry.stat()
+                meta_entry = json_entries.get(name[:-len('.json')] + _META_SUFFIX)
+                
+                # Trust the sidecar only if it is at least as new as the tree file;
+                # older saves (or files edited by hand) fall back to a full parse
+                if meta_entry is not None and meta_entry.stat().st_mtime_ns >= stat.st_mtime_ns:
+                    with open(meta_entry.path, 'rb') as f:
+                        metadata = loads(f.read())
+                else:
+                    with open(entry.path, 'rb') as f:
+                        metadata = loads(f.read()).get('metadata', {})
                 
-                metadata = data.get('metadata', {})
                 conversations.append({
-                    'filename': filepath.name,
-                    'name': filepath.stem,
+                    'filename': entry.name,
+                    'name': entry.name[:-len('.json')],
                     'saved_at': metadata.get('saved_at', 'Unknown'),
                     'state_count': metadata.get('state_count', 0),
-                    'size': f"{filepath.stat().st_size / 1024:.1f} KB"
+                    'size': f"{stat.st_size / 1024:.1f} KB"
                 })
                 
             except Exception:
@@ -115,7 +162,10 @@ class ConversationPersistence:
         
         # Sort by saved_at descending
         conversations.sort(key=lambda x: x['saved_at'], reverse=True)
-        return conversations
+        
+        self._list_cache = conversations
+        self._list_cache_mtime = mtime
+        return list(conversations)
     
     def delete_conversation(self, filename: str) -> bool:
         """
@@ -135,11 +185,17 @@ class ConversationPersistence:
         try:
             if filepath.exists():
                 filepath.unlink()
+                self._meta_path(filename).unlink(missing_ok=True)
+                self._list_cache_mtime = -1
                 return True
             return False
         except Exception as e:
             raise PersistenceError(f"Failed to delete conversation: {e}")
     
+    def _meta_path(self, filename: str) -> Path:
+        """Get the metadata sidecar path for a saved conversation file."""
+        return self.save_directory / (filename[:-len('.json')] + _META_SUFFIX)
+    
     def get_save_directory(self) -> Path:
         """Get the save directory path."""
         return self.save_directory
\ No newline at end of file
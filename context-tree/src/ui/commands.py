@@ -29,6 +29,7 @@ class AppContext:
     persistence: ConversationPersistence
     current_model: Optional[str] = None
     system_message: Optional[str] = None
+    max_context_chars: Optional[int] = None
 
 
 class Command(ABC):
@@ -320,6 +321,40 @@ class TreeCommand(Command):
         return "Interactive tree browser with live preview"
 
 
+class BudgetCommand(Command):
+    """Limit how much history is sent with each message."""
+    
+    @property
+    def name(self) -> str:
+        return "budget"
+    
+    @property
+    def aliases(self) -> List[str]:
+        return ["b"]
+    
+    def execute(self, args: List[str], context: AppContext) -> CommandResult:
+        if not args:
+            if context.max_context_chars is None:
+                return CommandResult(True, "Context budget: off (full history is sent)")
+            return CommandResult(True, f"Context budget: {context.max_context_chars} characters")
+        
+        if args[0].lower() == "off":
+            return CommandResult(True, "set_budget", data=None)
+        
+        try:
+            max_chars = int(args[0])
+        except ValueError:
+            return CommandResult(False, "Usage: /budget <characters> or /budget off")
+        
+        if max_chars <= 0:
+            return CommandResult(False, "Budget must be a positive number of characters")
+        
+        return CommandResult(True, "set_budget", data=max_chars)
+    
+    def get_help(self) -> str:
+        return "Cap the characters of history sent per message, dropping the oldest turns"
+
+
 class CommandRegistry:
     """Command registration and dispatch."""
     
@@ -344,6 +379,7 @@ class CommandRegistry:
             NewCommand(),
             QuitCommand(),
             TreeCommand(),
+            BudgetCommand(),
         ]
         
         for command in commands:
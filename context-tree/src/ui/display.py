@@ -10,6 +10,8 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ui.renderer import TreeRenderer
 
+_CLEAR_LINE = "\r" + " " * 80 + "\r"
+
 class StreamingDisplay:
     """Handle streaming display with Rich formatting."""
     
@@ -23,16 +25,16 @@ class StreamingDisplay:
         self.console.print()  # Add some space
         self.console.print("🤖 Assistant: ", style="bright_green bold", end="")
         
-        complete_response = ""
+        chunks = []
         
         # Stream chunks directly without Live wrapper
         for chunk in response_generator:
-            complete_response += chunk
+            chunks.append(chunk)
             # Use regular print for streaming content to allow scrolling
             print(chunk, end="", flush=True)
         
         print()  # Newline at end
-        return complete_response
+        return "".join(chunks)
     
     def show_thinking(self, message: str = "Thinking") -> Live:
         """Show thinking indicator with spinner."""
@@ -87,4 +89,4 @@ class StreamingDisplay:
     
     def clear_line(self):
         """Clear current line."""
-        self.console.print("\r" + " " * 80 + "\r", end="")
\ No newline at end of file
+        self.console.print(_CLEAR_LINE, end="")
\ No newline at end of file
@@ -6,8 +6,35 @@ import tty
 from typing import Optional, List, Dict, Any
 from core.tree import ConversationTree
 from core.state import ConversationState
+from utils.formatting import truncate
 from utils.validators import parse_state_identifier
 
+# Tree drawing segments
+_PREFIX_LAST = "    "
+_PREFIX_MID = "│   "
+_BRANCH_LAST = "└── "
+_BRANCH_MID = "├── "
+
+# Fixed-width separators, built once instead of on every redraw
+_RULE_SHORT = "-" * 40
+_RULE = "-" * 60
+_RULE_HEAVY = "=" * 60
+_RULE_LIGHT = "─" * 60
+
+
+def read_choice(prompt: str) -> str:
+    """
+    Read a short menu answer straight from stdin, bypassing readline.
+    Keeps menu picks out of the chat history; raises EOFError like input().
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip("\n")
+
+
 class InteractiveSelector:
     """Interactive state selector with live preview."""
     
@@ -22,7 +49,7 @@ class InteractiveSelector:
         """
         print("\n🔍 Interactive State Selection")
         print("Type state number or ID (ESC to cancel):")
-        print("-" * 40)
+        print(_RULE_SHORT)
         
         try:
             while True:
@@ -106,10 +133,10 @@ class InteractiveSelector:
     def _format_state_preview(self, state: ConversationState) -> str:
         """Format state for preview display."""
         # Truncate message to reasonable length
-        message_preview = state.message[:40] + "..." if len(state.message) > 40 else state.message
+        message_preview = truncate(state.message, 40)
         
         # Truncate response to reasonable length  
-        response_preview = state.response[:40] + "..." if len(state.response) > 40 else state.response
+        response_preview = truncate(state.response, 40)
         
         tags_display = ""
         if state.tags:
@@ -132,7 +159,7 @@ class InteractiveTreeBrowser:
         """
         print("\n🌳 Interactive Tree Browser")
         print("Use arrow keys to navigate, Enter to select, ESC to cancel")
-        print("=" * 60)
+        print(_RULE_HEAVY)
         
         try:
             while True:
@@ -188,7 +215,7 @@ class InteractiveTreeBrowser:
         
         print("🌳 Interactive Tree Browser")
         print("Use j/k (or ↑↓) to navigate, h/l (or ←→) for parent/child, Enter to select, ESC/q to cancel")
-        print("=" * 60)
+        print(_RULE_HEAVY)
         
         if self.tree.state_count == 0:
             print("No conversation states yet.")
@@ -201,15 +228,15 @@ class InteractiveTreeBrowser:
         if self.current_view_state:
             current_state = self.tree.find_state(self.current_view_state)
             if current_state:
-                print("\n" + "─" * 60)
+                print("\n" + _RULE_LIGHT)
                 print(f"Selected: {current_state.display_name}")
                 
                 # Truncate message display
-                message_display = current_state.message[:80] + "..." if len(current_state.message) > 80 else current_state.message
+                message_display = truncate(current_state.message, 80)
                 print(f"Message: {message_display}")
                 
                 # Truncate response display
-                response_display = current_state.response[:100] + "..." if len(current_state.response) > 100 else current_state.response
+                response_display = truncate(current_state.response, 100)
                 print(f"Response: {response_display}")
                 
                 if current_state.tags:
@@ -217,40 +244,42 @@ class InteractiveTreeBrowser:
     
     def _render_tree_with_highlight(self):
         """Render tree with current selection highlighted."""
-        all_states = self.tree.get_all_states()
-        roots = [s for s in all_states if s.is_root]
+        roots = [s for s in self.tree.iter_states() if s.is_root]
         
-        for root in roots:
-            self._render_state_node(root, "", True, 0)
-    
-    def _render_state_node(self, state: ConversationState, prefix: str, is_last: bool, depth: int):
-        """Render a single state node with highlighting."""
-        # Determine if this state is currently selected
-        is_selected = state.hierarchical_id == self.current_view_state
+        lines = []
+        # Iterative DFS: (state, prefix, is_last, depth); roots pushed in reverse to keep order
+        stack = [(root, "", True, 0) for root in reversed(roots)]
         
+        while stack:
+            state, prefix, is_last, depth = stack.pop()
+            lines.append(self._format_state_node(state, prefix, is_last, depth))
+            lines.append("\n")
+            
+            children = self.tree.get_children(state.hierarchical_id)
+            if children:
+                child_prefix = prefix + (_PREFIX_LAST if is_last else _PREFIX_MID)
+                last_index = len(children) - 1
+                for i in range(last_index, -1, -1):
+                    stack.append((children[i], child_prefix, i == last_index, depth + 1))
+        
+        # Stream lines straight to stdout rather than materializing a joined copy
+        sys.stdout.writelines(lines)
+    
+    def _format_state_node(self, state: ConversationState, prefix: str, is_last: bool, depth: int) -> str:
+        """Format a single state node line with highlighting."""
         # Create tree prefix
         if depth == 0:
             tree_prefix = ""
         else:
-            tree_prefix = prefix + ("└── " if is_last else "├── ")
+            tree_prefix = prefix + (_BRANCH_LAST if is_last else _BRANCH_MID)
         
         # Format state display with truncated message
-        message_preview = state.message[:35] + "..." if len(state.message) > 35 else state.message
+        message_preview = truncate(state.message, 35)
         
         # Highlight selected state
-        if is_selected:
-            line = f"{tree_prefix}► {state.display_name}: {message_preview}"
-            print(f"\033[7m{line}\033[0m")  # Reverse video
-        else:
-            line = f"{tree_prefix}  {state.display_name}: {message_preview}"
-            print(line)
-        
-        # Render children
-        children = self.tree.get_children(state.hierarchical_id)
-        for i, child in enumerate(children):
-            is_last_child = i == len(children) - 1
-            child_prefix = prefix + ("    " if is_last else "│   ")
-            self._render_state_node(child, child_prefix, is_last_child, depth + 1)
+        if state.hierarchical_id == self.current_view_state:
+            return f"\033[7m{tree_prefix}► {state.display_name}: {message_preview}\033[0m"  # Reverse video
+        return f"{tree_prefix}  {state.display_name}: {message_preview}"
     
     def _navigate_down(self):
         """Navigate to next state in tree order."""
@@ -373,17 +402,16 @@ class LoadSelector:
             print("No saved conversations found.")
             return None
         
-        print("\n📁 Load Conversation")
-        print("Available conversations:")
-        print("-" * 60)
-        
+        # Assemble the whole menu so it goes out in a single write
+        lines = ["\n📁 Load Conversation", "Available conversations:", _RULE]
         for i, conv in enumerate(self.conversations, 1):
-            print(f"  {i}. {conv['name']}")
-            print(f"     Saved: {conv['saved_at'][:19]} | States: {conv['state_count']} | Size: {conv['size']}")
-            print()
+            lines.append(f"  {i}. {conv['name']}")
+            lines.append(f"     Saved: {conv['saved_at'][:19]} | States: {conv['state_count']} | Size: {conv['size']}")
+            lines.append("")
+        print("\n".join(lines))
         
         try:
-            choice = input(f"Select conversation (1-{len(self.conversations)}) or Enter to cancel: ").strip()
+            choice = read_choice(f"Select conversation (1-{len(self.conversations)}) or Enter to cancel: ").strip()
             
             if not choice:
                 return None
@@ -1,52 +1,82 @@
 """Tree visualization and rendering utilities."""
 
-from typing import List, Dict, Optional
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Dict, Optional, FrozenSet
 from rich.console import Console
+from rich.style import Style
 from rich.tree import Tree
 from rich.text import Text
 from rich.panel import Panel
 
 from core.tree import ConversationTree
 from core.state import ConversationState
+from utils.formatting import truncate
+
+# Pre-parsed styles for per-node formatting
+_STYLE_CURRENT = Style(color="cyan", bold=True)
+_STYLE_CURRENT_MARKER = Style(color="bright_cyan")
+_STYLE_STATE = Style(color="cyan")
+_STYLE_MESSAGE = Style(color="white")
+_STYLE_TAG = Style(color="yellow")
+
+_SUMMARY_RULE = "─" * 60
+_COMPARISON_RULE = "=" * 70
+
+
+@lru_cache(maxsize=256)
+def _summary_tags(tags: FrozenSet[str]) -> str:
+    """Format the summary tag label; tag sets repeat across states and renders."""
+    if not tags:
+        return ""
+    return f" [{', '.join(list(tags)[:2])}]"
+
+
+@lru_cache(maxsize=1024)
+def _clock_time(timestamp: datetime) -> str:
+    """Format a state timestamp as HH:MM:SS; timestamps never change after creation."""
+    return timestamp.strftime("%H:%M:%S")
 
 class TreeRenderer:
     """Professional tree rendering with Rich library."""
     
     def __init__(self):
         self.console = Console()
+        # Last rendered tree: (tree, version, current_state_id, width, output)
+        self._tree_cache: Optional[tuple] = None
     
     def render_tree(self, tree: ConversationTree, highlight_current: bool = True) -> str:
         """Render conversation tree with Rich formatting."""
         if tree.state_count == 0:
             return "No conversation states yet."
         
+        # Reuse the previous render when neither the tree nor the highlight has changed
+        current_id = tree.current_state_id if highlight_current else None
+        width = self.console.width
+        cached = self._tree_cache
+        if (cached and cached[0] is tree and cached[1] == tree.version
+                and cached[2] == current_id and cached[3] == width):
+            return cached[4]
+        
         # Create Rich tree
         rich_tree = Tree("🌳 Conversation Tree")
         
-        # Get root states
-        roots = tree.get_root_states()
-        
-        for root in roots:
-            self._add_state_to_tree(tree, rich_tree, root, highlight_current)
+        # Walk the tree in one pass with an explicit stack of (parent_node, state),
+        # pushing siblings in reverse so they are added in their original order
+        stack = [(rich_tree, root) for root in reversed(tree.get_root_states())]
+        while stack:
+            parent_node, state = stack.pop()
+            state_node = parent_node.add(self._format_state_display(state, current_id))
+            children = tree.get_children(state.hierarchical_id)
+            stack.extend((state_node, child) for child in reversed(children))
         
         # Capture output
         with self.console.capture() as capture:
             self.console.print(rich_tree)
         
-        return capture.get()
-    
-    def _add_state_to_tree(self, tree: ConversationTree, parent_node, state: ConversationState, highlight_current: bool):
-        """Recursively add state and children to Rich tree."""
-        # Format state display
-        display_text = self._format_state_display(state, tree.current_state_id if highlight_current else None)
-        
-        # Add to tree
-        state_node = parent_node.add(display_text)
-        
-        # Add children
-        children = tree.get_children(state.hierarchical_id)
-        for child in children:
-            self._add_state_to_tree(tree, state_node, child, highlight_current)
+        output = capture.get()
+        self._tree_cache = (tree, tree.version, current_id, width, output)
+        return output
     
     def _format_state_display(self, state: ConversationState, current_state_id: Optional[str]) -> Text:
         """Format state for display with colors and styling."""
@@ -54,26 +84,26 @@ class TreeRenderer:
         
         # State ID with styling
         if state.hierarchical_id == current_state_id:
-            text.append(f"{state.display_name}", style="bold cyan")
-            text.append(" ← current", style="bright_cyan")
+            text.append(state.display_name, style=_STYLE_CURRENT)
+            text.append(" ← current", style=_STYLE_CURRENT_MARKER)
         else:
-            text.append(f"{state.display_name}", style="cyan")
+            text.append(state.display_name, style=_STYLE_STATE)
         
         text.append(": ")
         
         # Message preview
-        message_preview = state.message[:40] + "..." if len(state.message) > 40 else state.message
-        text.append(message_preview, style="white")
+        message_preview = truncate(state.message, 40)
+        text.append(message_preview, style=_STYLE_MESSAGE)
         
         # Tags
         if state.tags:
             text.append(" ")
             for tag in list(state.tags)[:3]:  # Show max 3 tags
-                text.append(f"[{tag}]", style="yellow")
+                text.append(f"[{tag}]", style=_STYLE_TAG)
         
         # Branch indicator - use the property
         if state.is_branch:
-            text.append(" 🌿", style="yellow")
+            text.append(" 🌿", style=_STYLE_TAG)
         
         return text
     
@@ -85,18 +115,16 @@ class TreeRenderer:
         # Create table-like output
         lines = []
         lines.append("📊 State Summary")
-        lines.append("─" * 60)
+        lines.append(_SUMMARY_RULE)
         
         for state in states:
             current_marker = " ← current" if state.hierarchical_id == current_state_id else ""
             
             # Format line
-            timestamp = state.timestamp.strftime("%H:%M:%S")
-            message_preview = state.message[:35] + "..." if len(state.message) > 35 else state.message
+            timestamp = _clock_time(state.timestamp)
+            message_preview = truncate(state.message, 35)
             
-            tags_display = ""
-            if state.tags:
-                tags_display = f" [{', '.join(list(state.tags)[:2])}]"
+            tags_display = _summary_tags(state.tags)
             
             line = f"  {state.display_name}: {message_preview}{tags_display} [{timestamp}]{current_marker}"
             lines.append(line)
@@ -141,7 +169,7 @@ class TreeRenderer:
         """Render side-by-side comparison of two states."""
         lines = []
         lines.append("🔍 Branch Comparison")
-        lines.append("=" * 70)
+        lines.append(_COMPARISON_RULE)
         
         # Headers
         lines.append(f"Branch A: {state1.display_name} | Branch B: {state2.display_name}")
@@ -155,10 +183,8 @@ class TreeRenderer:
         
         # Responses (truncated)
         lines.append("🤖 Assistant Responses:")
-        resp1 = state1.response[:100] + "..." if len(state1.response) > 100 else state1.response
-        resp2 = state2.response[:100] + "..." if len(state2.response) > 100 else state2.response
-        lines.append(f"A: {resp1}")
-        lines.append(f"B: {resp2}")
+        lines.append(f"A: {truncate(state1.response, 100)}")
+        lines.append(f"B: {truncate(state2.response, 100)}")
         lines.append("")
         
         # Tags
@@ -0,0 +1,9 @@
+"""Text formatting helpers for display code."""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=2048)
+def truncate(text: str, max_length: int) -> str:
+    """Truncate text to max_length characters, appending '...' when cut."""
+    return text if len(text) <= max_length else text[:max_length] + "..."
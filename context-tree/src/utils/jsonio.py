@@ -0,0 +1,58 @@
+"""JSON encoding helpers that use orjson when it is installed."""
+
+import json
+from typing import Any, BinaryIO, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Request headers for bodies produced by dumps()
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Encoded text is flushed to the file in pieces of about this many characters
+_DUMP_CHUNK = 1 << 16
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, compact unless pretty asks for 2-space indents."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(obj)
+    # Match orjson's output so request bodies are byte-identical either way
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dump(obj: Any, fp: BinaryIO, pretty: bool = False) -> None:
+    """Write obj as UTF-8 JSON to a binary file, in the same format as dumps()."""
+    if orjson is not None:
+        # orjson has no incremental encoder, but one C pass into bytes is cheap
+        fp.write(dumps(obj, pretty))
+        return
+    
+    if pretty:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    
+    # Encode incrementally so the whole document never exists as one string;
+    # batching the tiny fragments keeps the per-write overhead down
+    pending = []
+    size = 0
+    for fragment in encoder.iterencode(obj):
+        pending.append(fragment)
+        size += len(fragment)
+        if size >= _DUMP_CHUNK:
+            fp.write("".join(pending).encode("utf-8"))
+            pending.clear()
+            size = 0
+    fp.write("".join(pending).encode("utf-8"))
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON from bytes or str; raises ValueError on bad input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
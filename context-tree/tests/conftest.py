@@ -48,6 +48,17 @@ def sample_tree():
     return tree
 
 
+@pytest.fixture(params=["json", "orjson"])
+def json_backend(request, monkeypatch):
+    """Run a test once with the stdlib codec and once with orjson, when installed."""
+    from utils import jsonio
+    if request.param == "json":
+        monkeypatch.setattr(jsonio, "orjson", None)
+    else:
+        monkeypatch.setattr(jsonio, "orjson", pytest.importorskip("orjson"))
+    return request.param
+
+
 @pytest.fixture
 def temp_storage_dir():
     """Create temporary directory for storage tests."""
@@ -0,0 +1,35 @@
+"""Tests for TreeNavigator."""
+
+from core.navigation import TreeNavigator
+from core.tree import ConversationTree
+
+
+def test_string_suggestions_rank_closest_ids_first():
+    """Test a mistyped hierarchical ID suggests its nearest real IDs, best first."""
+    tree = ConversationTree()
+    root = tree.add_state(None, "q", "a", "m")
+    tree.add_state(root.hierarchical_id, "q", "a", "m")
+    branch = tree.add_state(root.hierarchical_id, "q", "a", "m")
+    tree.add_state(branch.hierarchical_id, "q", "a", "m")
+    tree.add_state(branch.hierarchical_id, "q", "a", "m")
+    
+    suggestions = TreeNavigator(tree)._get_navigation_suggestions("1.2.3")
+    
+    assert suggestions == ["Try '1.2.2'", "Try '1.2'", "Use '/states' to see all available states"]
+
+
+def test_sequence_suggestions_match_a_full_scan():
+    """Test bisecting the sorted IDs finds the same neighbours as scanning every state."""
+    tree = ConversationTree()
+    parent = None
+    for _ in range(10):
+        parent = tree.add_state(parent, "q", "a", "m").hierarchical_id
+    navigator = TreeNavigator(tree)
+    all_sequences = [s.sequence_id for s in tree.get_all_states()]
+    
+    for identifier in range(-3, 15):
+        expected = [s for s in all_sequences if abs(s - identifier) <= 2][:3]
+        assert navigator._get_navigation_suggestions(identifier) == [
+            *(f"Try sequence {s}" for s in expected),
+            "Use '/states' to see all available states",
+        ]
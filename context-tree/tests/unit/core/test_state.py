@@ -72,4 +72,18 @@ def test_state_serialization():
     
     assert restored_state.hierarchical_id == original_state.hierarchical_id
     assert restored_state.sequence_id == original_state.sequence_id
-    assert restored_state.tags == original_state.tags
\ No newline at end of file
+    assert restored_state.tags == original_state.tags
+
+def test_state_depth_follows_hierarchy():
+    """Test depth counts levels of the hierarchical ID."""
+    state = ConversationState(
+        hierarchical_id="1.2.10",
+        sequence_id=5,
+        parent_id="1.2",
+        message="Test",
+        response="Test",
+        model="test-model",
+        timestamp=datetime.now()
+    )
+    
+    assert state.depth == 3
@@ -1,5 +1,7 @@
 """Tests for ConversationTree."""
 
+import asyncio
+import json
 import pytest
 import sys
 from pathlib import Path
@@ -98,4 +100,157 @@ def test_tree_serialization():
     assert len(original_states) == len(restored_states)
     for orig, restored in zip(original_states, restored_states):
         assert orig.hierarchical_id == restored.hierarchical_id
-        assert orig.message == restored.message
\ No newline at end of file
+        assert orig.message == restored.message
+
+def test_version_tracks_mutations():
+    """Test version changes on content mutations but not on navigation."""
+    tree = ConversationTree()
+    assert tree.version == 0
+    
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    after_add = tree.version
+    assert after_add > 0
+    
+    tree.navigate_to(root.hierarchical_id)
+    assert tree.version == after_add
+    
+    tree.update_state(root.hierarchical_id, root.add_tag("important"))
+    after_update = tree.version
+    assert after_update > after_add
+    
+    tree.clear()
+    assert tree.version > after_update
+
+
+def test_conversation_messages_follow_branch():
+    """Test cached conversation context stays per-branch and isolated from callers."""
+    tree = ConversationTree()
+    
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    child1 = tree.add_state(root.hierarchical_id, "Child 1", "Response 1", "test-model")
+    child2 = tree.add_state(root.hierarchical_id, "Child 2", "Response 2", "test-model")
+    
+    messages = tree.get_conversation_messages(child2.hierarchical_id)
+    assert [m["content"] for m in messages] == ["Root", "Root response", "Child 2", "Response 2"]
+    
+    # Mutating the returned list must not leak into later calls
+    messages.append({"role": "user", "content": "extra"})
+    assert len(tree.get_conversation_messages(child2.hierarchical_id)) == 4
+    
+    restored = ConversationTree.from_dict(tree.to_dict())
+    assert restored.get_conversation_messages(child1.hierarchical_id) == \
+        tree.get_conversation_messages(child1.hierarchical_id)
+
+
+def test_from_dict_restores_sequence_order():
+    """Test states load in sequence order even if the file lists them out of order."""
+    tree = ConversationTree()
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    tree.add_state(root.hierarchical_id, "Child 1", "Response 1", "test-model")
+    tree.add_state(root.hierarchical_id, "Child 2", "Response 2", "test-model")
+    
+    data = tree.to_dict()
+    data['states'] = dict(reversed(list(data['states'].items())))
+    restored = ConversationTree.from_dict(data)
+    
+    assert [s.sequence_id for s in restored.get_all_states()] == [1, 2, 3]
+    assert list(restored.sorted_sequence_ids) == [1, 2, 3]
+    assert restored.get_children(root.hierarchical_id) == tree.get_children(root.hierarchical_id)
+
+
+def test_path_to_root_order():
+    """Test path runs from root down to the requested state."""
+    tree = ConversationTree()
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    child = tree.add_state(root.hierarchical_id, "Child", "Child response", "test-model")
+    grandchild = tree.add_state(child.hierarchical_id, "Grandchild", "Response", "test-model")
+    
+    path = tree.get_path_to_root(grandchild.hierarchical_id)
+    assert [s.hierarchical_id for s in path] == [
+        root.hierarchical_id, child.hierarchical_id, grandchild.hierarchical_id
+    ]
+    assert tree.get_path_to_root("missing") == []
+
+
+def test_conversation_messages_extend_parent_prefix():
+    """Test each turn's context starts with its parent's context unchanged."""
+    tree = ConversationTree()
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    child = tree.add_state(root.hierarchical_id, "Child", "Child response", "test-model")
+    
+    parent_messages = tree.get_conversation_messages(root.hierarchical_id)
+    child_messages = tree.get_conversation_messages(child.hierarchical_id)
+    assert child_messages[:len(parent_messages)] == parent_messages
+    assert child_messages[len(parent_messages):] == [
+        {"role": "user", "content": "Child"},
+        {"role": "assistant", "content": "Child response"},
+    ]
+
+
+def test_conversation_messages_reuse_cached_ancestor():
+    """Test a cold lookup below a cached ancestor matches a full rebuild."""
+    tree = ConversationTree()
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    child = tree.add_state(root.hierarchical_id, "Child", "Child response", "test-model")
+    leaf = tree.add_state(child.hierarchical_id, "Leaf", "Leaf response", "test-model")
+    expected = tree.get_conversation_messages(leaf.hierarchical_id)
+    
+    restored = ConversationTree.from_dict(tree.to_dict())
+    restored.get_conversation_messages(root.hierarchical_id)
+    assert restored.get_conversation_messages(leaf.hierarchical_id) == expected
+
+
+def test_aregenerate_children_adds_branch_per_prompt():
+    """Test concurrent regeneration adds one child per prompt with the parent's context."""
+    class FakeClient:
+        def __init__(self):
+            self.batch = None
+        
+        async def achat_many(self, batch):
+            self.batch = batch
+            return [f"reply to {messages[-1]['content']}" for messages, _ in batch]
+    
+    tree = ConversationTree()
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    client = FakeClient()
+    
+    children = asyncio.run(tree.aregenerate_children(
+        root.hierarchical_id, ["A", "B"], "test-model", client, system_message="Be brief"
+    ))
+    
+    assert [c.message for c in children] == ["A", "B"]
+    assert [c.response for c in children] == ["reply to A", "reply to B"]
+    assert tree.get_children(root.hierarchical_id) == children
+    assert tree.current_state_id == children[-1].hierarchical_id
+    assert client.batch[0][0][:3] == [
+        {"role": "system", "content": "Be brief"},
+        {"role": "user", "content": "Root"},
+        {"role": "assistant", "content": "Root response"},
+    ]
+
+
+def test_from_dict_shares_repeated_text():
+    """Test identical messages loaded from a file share one string object."""
+    tree = ConversationTree()
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    tree.add_state(root.hierarchical_id, "Same question", "Answer 1", "test-model")
+    tree.add_state(root.hierarchical_id, "Same question", "Answer 2", "test-model")
+    
+    data = json.loads(json.dumps(tree.to_dict()))
+    first, second = ConversationTree.from_dict(data).get_children(root.hierarchical_id)
+    
+    assert first.message is second.message
+    assert first.model is second.model
+
+
+def test_to_dict_timestamps_survive_round_trip():
+    """Test serialization reports tracked times instead of restamping the tree."""
+    tree = ConversationTree()
+    root = tree.add_state(None, "Root", "Root response", "test-model")
+    
+    metadata = tree.to_dict()['metadata']
+    assert metadata['last_modified'] == root.timestamp.isoformat()
+    assert metadata['created_at'] <= metadata['last_modified']
+    
+    restored = ConversationTree.from_dict(tree.to_dict())
+    assert restored.to_dict()['metadata'] == metadata
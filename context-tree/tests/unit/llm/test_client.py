@@ -0,0 +1,84 @@
+"""Tests for the Ollama client."""
+
+import json
+import threading
+import time
+
+import requests
+
+from llm.client import OllamaClient
+
+
+def test_chat_many_runs_concurrently_and_keeps_order(monkeypatch):
+    """Test batched chats overlap and come back in request order."""
+    client = OllamaClient("http://127.0.0.1:1")
+    # Every chat waits for the other three, so a serial run breaks the barrier
+    barrier = threading.Barrier(4, timeout=5)
+    
+    def fake_chat(messages, model):
+        barrier.wait()
+        return f"{model}:{messages[-1]['content']}"
+    
+    monkeypatch.setattr(client, "chat", fake_chat)
+    batch = [([{"role": "user", "content": str(i)}], "m") for i in range(4)]
+    
+    results = client.chat_many(batch)
+    
+    assert results == ["m:0", "m:1", "m:2", "m:3"]
+
+
+def test_is_connected_probes_past_the_model_cache():
+    """Test a cached model list does not hide a server that has gone away."""
+    client = OllamaClient("http://127.0.0.1:1")
+    client._models_cache = (time.monotonic(), ["m"])
+    
+    assert client.is_connected() is False
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+    
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.content = json.dumps(payload or {}).encode()
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(response=self)
+
+
+class FakeSession:
+    """Session that answers /api/ps and records the requests it gets."""
+    
+    def __init__(self, ps_response):
+        self.ps_response = ps_response
+        self.posts = []
+    
+    def get(self, url, timeout):
+        assert url.endswith("/api/ps")
+        return self.ps_response
+    
+    def post(self, url, data, headers, timeout):
+        self.posts.append((url, json.loads(data)))
+        return FakeResponse(200)
+
+
+def test_check_model_loaded_reads_running_models():
+    """Test the check uses /api/ps and matches untagged names to :latest."""
+    client = OllamaClient("http://127.0.0.1:1")
+    client._session = FakeSession(FakeResponse(200, {"models": [{"name": "llama3:latest"}]}))
+    
+    assert client.check_model_loaded("llama3") is True
+    assert client.check_model_loaded("mistral") is False
+    assert client._session.posts == []
+
+
+def test_check_model_loaded_falls_back_without_ps_endpoint():
+    """Test servers without /api/ps get an empty keep-alive chat instead."""
+    client = OllamaClient("http://127.0.0.1:1")
+    client._session = FakeSession(FakeResponse(404))
+    
+    assert client.check_model_loaded("llama3") is True
+    assert client._session.posts == [
+        ("http://127.0.0.1:1/api/chat", {"model": "llama3", "messages": [], "keep_alive": "5m"})
+    ]
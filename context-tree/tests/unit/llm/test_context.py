@@ -0,0 +1,45 @@
+"""Tests for context window trimming."""
+
+from llm.context import trim_messages
+
+
+def _turns(*pairs):
+    messages = []
+    for user, assistant in pairs:
+        messages.append({"role": "user", "content": user})
+        messages.append({"role": "assistant", "content": assistant})
+    return messages
+
+
+def test_trim_messages_under_budget_is_unchanged():
+    """Test messages within the budget are returned as-is."""
+    messages = _turns(("hi", "hello"))
+    assert trim_messages(messages, 100) is messages
+
+
+def test_trim_messages_drops_oldest_turns():
+    """Test the oldest turns go first while system and latest message stay."""
+    system = {"role": "system", "content": "sys"}
+    latest = {"role": "user", "content": "now"}
+    messages = [system] + _turns(("aaaa", "bbbb"), ("cc", "dd")) + [latest]
+    
+    trimmed = trim_messages(messages, 12)
+    assert trimmed == [system, {"role": "user", "content": "cc"},
+                       {"role": "assistant", "content": "dd"}, latest]
+
+
+def test_trim_messages_never_starts_on_assistant_reply():
+    """Test a window that would open on an assistant reply skips past it."""
+    latest = {"role": "user", "content": "now"}
+    messages = _turns(("aaaa", "b"), ("c", "d")) + [latest]
+    
+    trimmed = trim_messages(messages, 8)
+    assert trimmed[0] == {"role": "user", "content": "c"}
+    assert trimmed[-1] == latest
+
+
+def test_trim_messages_keeps_latest_message_over_budget():
+    """Test the newest message is sent even when it alone exceeds the budget."""
+    latest = {"role": "user", "content": "x" * 50}
+    messages = _turns(("a", "b")) + [latest]
+    assert trim_messages(messages, 10) == [latest]
@@ -0,0 +1,64 @@
+"""Tests for retrying transient Ollama failures."""
+
+import pytest
+import requests
+
+from llm import retry
+from llm.retry import backoff_delay, with_retry
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(retry.time, "sleep", delays.append)
+    return delays
+
+
+def test_with_retry_recovers_from_transient_errors(sleeps):
+    """Test connection errors and 5xx responses are retried until success."""
+    errors = [requests.exceptions.ConnectionError(), _http_error(503)]
+    
+    def request():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+    
+    assert with_retry(request) == "ok"
+    assert len(sleeps) == 2
+
+
+def test_with_retry_does_not_retry_client_errors(sleeps):
+    """Test 4xx responses fail immediately."""
+    calls = []
+    
+    def request():
+        calls.append(1)
+        raise _http_error(404)
+    
+    with pytest.raises(requests.exceptions.HTTPError):
+        with_retry(request)
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_with_retry_gives_up_after_last_attempt(sleeps):
+    """Test the final transient error is raised once attempts run out."""
+    def request():
+        raise requests.exceptions.Timeout()
+    
+    with pytest.raises(requests.exceptions.Timeout):
+        with_retry(request, attempts=3)
+    assert len(sleeps) == 2
+
+
+def test_backoff_delay_grows_and_is_capped():
+    """Test delays double per attempt within the jitter band and never exceed the cap."""
+    assert 1.0 <= backoff_delay(0) <= 1.5
+    assert 4.0 <= backoff_delay(2) <= 6.0
+    assert backoff_delay(10) == 30.0
@@ -0,0 +1,115 @@
+"""Tests for ConversationPersistence."""
+
+import json
+
+import pytest
+
+from storage import persistence as persistence_module
+from storage.persistence import ConversationPersistence
+from utils.errors import PersistenceError
+
+
+def test_save_writes_metadata_sidecar(temp_storage_dir, sample_tree):
+    """Test saves leave a metadata sidecar that listings read instead of the tree."""
+    persistence = ConversationPersistence(temp_storage_dir)
+    persistence.save_conversation(sample_tree, "trip")
+    
+    sidecar = json.loads((temp_storage_dir / "trip.meta.json").read_text())
+    assert sidecar["state_count"] == 3
+    
+    conversations = persistence.list_conversations()
+    assert [c["filename"] for c in conversations] == ["trip.json"]
+    assert conversations[0]["state_count"] == 3
+
+
+def test_list_falls_back_to_tree_without_sidecar(temp_storage_dir, sample_tree):
+    """Test files saved before sidecars existed are still listed."""
+    data = sample_tree.to_dict()
+    data["metadata"]["saved_at"] = "2024-01-01T00:00:00"
+    (temp_storage_dir / "legacy.json").write_text(json.dumps(data))
+    
+    conversations = ConversationPersistence(temp_storage_dir).list_conversations()
+    assert [(c["name"], c["state_count"]) for c in conversations] == [("legacy", 3)]
+
+
+def test_delete_removes_sidecar(temp_storage_dir, sample_tree):
+    """Test deleting a conversation also deletes its sidecar."""
+    persistence = ConversationPersistence(temp_storage_dir)
+    persistence.save_conversation(sample_tree, "trip")
+    
+    assert persistence.delete_conversation("trip")
+    assert list(temp_storage_dir.iterdir()) == []
+
+
+def test_list_reuses_cache_until_directory_changes(temp_storage_dir, sample_tree):
+    """Test listings are cached but pick up saves and deletes."""
+    persistence = ConversationPersistence(temp_storage_dir)
+    persistence.save_conversation(sample_tree, "first")
+    assert [c["name"] for c in persistence.list_conversations()] == ["first"]
+    
+    persistence.save_conversation(sample_tree, "second")
+    assert sorted(c["name"] for c in persistence.list_conversations()) == ["first", "second"]
+    
+    persistence.delete_conversation("first")
+    assert [c["name"] for c in persistence.list_conversations()] == ["second"]
+
+
+def test_failed_save_keeps_previous_file(temp_storage_dir, sample_tree, monkeypatch):
+    """Test a save that dies mid-write leaves the old file and no temp file."""
+    persistence = ConversationPersistence(temp_storage_dir)
+    persistence.save_conversation(sample_tree, "trip")
+    before = (temp_storage_dir / "trip.json").read_bytes()
+    
+    def failing_dump(data, fp, pretty=False):
+        fp.write(b'{"partial')
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(persistence_module, "dump", failing_dump)
+    with pytest.raises(PersistenceError):
+        persistence.save_conversation(sample_tree, "trip")
+    
+    assert (temp_storage_dir / "trip.json").read_bytes() == before
+    assert sorted(p.name for p in temp_storage_dir.iterdir()) == ["trip.json", "trip.meta.json"]
+
+
+def test_save_is_compact_unless_pretty(temp_storage_dir, sample_tree, json_backend):
+    """Test saves drop indentation by default and both layouts load the same tree."""
+    persistence = ConversationPersistence(temp_storage_dir)
+    persistence.save_conversation(sample_tree, "compact")
+    persistence.save_conversation(sample_tree, "pretty", pretty=True)
+    
+    assert b"\n" not in (temp_storage_dir / "compact.json").read_bytes()
+    assert b'\n  "states"' in (temp_storage_dir / "pretty.json").read_bytes()
+    
+    compact = persistence.load_conversation("compact")
+    pretty = persistence.load_conversation("pretty")
+    assert compact.get_all_states() == pretty.get_all_states() == sample_tree.get_all_states()
+
+
+def test_load_reports_bad_json_and_bad_tree_separately(temp_storage_dir, sample_tree):
+    """Test decode errors say invalid JSON while bad tree data fails as a load error."""
+    persistence = ConversationPersistence(temp_storage_dir)
+    (temp_storage_dir / "broken.json").write_bytes(b"{not json")
+    
+    data = sample_tree.to_dict()
+    next(iter(data["states"].values()))["timestamp"] = "not a timestamp"
+    (temp_storage_dir / "bad.json").write_text(json.dumps(data))
+    
+    with pytest.raises(PersistenceError, match="Invalid JSON in file broken.json"):
+        persistence.load_conversation("broken")
+    with pytest.raises(PersistenceError, match="Failed to load conversation"):
+        persistence.load_conversation("bad")
+
+
+def test_load_falls_back_on_bad_metadata_timestamps(temp_storage_dir, sample_tree):
+    """Test malformed tree timestamps don't block a load and fall back to the root's."""
+    persistence = ConversationPersistence(temp_storage_dir)
+    data = sample_tree.to_dict()
+    data["metadata"]["created_at"] = "not a timestamp"
+    data["metadata"]["last_modified"] = None
+    (temp_storage_dir / "odd.json").write_text(json.dumps(data))
+    
+    metadata = persistence.load_conversation("odd").to_dict()["metadata"]
+    
+    root_timestamp = sample_tree.get_root_states()[0].timestamp.isoformat()
+    assert metadata["created_at"] == metadata["last_modified"] == root_timestamp
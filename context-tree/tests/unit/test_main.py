@@ -0,0 +1,24 @@
+"""Tests for the application's readline history handling."""
+
+import readline
+
+import main
+
+
+def test_flush_history_creates_missing_file(tmp_path):
+    """Test the first flush creates the history file, and later flushes append to it."""
+    app = main.OllamaTreeChatApp.__new__(main.OllamaTreeChatApp)
+    app._history_file = str(tmp_path / "history")
+    app._history_saved = 0
+    
+    readline.clear_history()
+    try:
+        readline.add_history("first")
+        readline.add_history("second")
+        app.flush_history()
+        readline.add_history("third")
+        app.flush_history()
+    finally:
+        readline.clear_history()
+    
+    assert (tmp_path / "history").read_text().splitlines() == ["first", "second", "third"]
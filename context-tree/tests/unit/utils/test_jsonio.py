@@ -0,0 +1,38 @@
+"""Tests for the JSON codec helpers."""
+
+import io
+import json
+
+import pytest
+
+from utils import jsonio
+
+
+DOCUMENT = {"text": "héllo 🌳", "items": [1, 2.5, None, True], "nested": {"empty": {}}}
+
+
+def test_dumps_matches_between_backends(json_backend):
+    """Test both backends produce the same bytes, compact and pretty."""
+    assert jsonio.dumps(DOCUMENT) == json.dumps(
+        DOCUMENT, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    assert jsonio.dumps(DOCUMENT, pretty=True) == json.dumps(
+        DOCUMENT, ensure_ascii=False, indent=2
+    ).encode("utf-8")
+
+
+def test_dump_round_trips(json_backend, monkeypatch):
+    """Test dump writes what dumps returns, even when split across chunks."""
+    monkeypatch.setattr(jsonio, "_DUMP_CHUNK", 8)
+    for pretty in (False, True):
+        buffer = io.BytesIO()
+        jsonio.dump(DOCUMENT, buffer, pretty=pretty)
+        
+        assert buffer.getvalue() == jsonio.dumps(DOCUMENT, pretty=pretty)
+        assert jsonio.loads(buffer.getvalue()) == DOCUMENT
+
+
+def test_loads_rejects_bad_input_with_value_error(json_backend):
+    """Test malformed JSON raises ValueError from either backend."""
+    with pytest.raises(ValueError):
+        jsonio.loads(b"{not json")